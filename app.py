@@ -6,18 +6,121 @@ Includes two-level caching:
 2. Screening result cache (by file hash + job details)
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-from main import ResumeProcessor
+from main import ResumeProcessor, NotAResumeError
+from cache_manager import CacheManager, SingleFlight
 import logging
-import json
+import os
+import orjson
+
+
+class OrjsonProvider(JSONProvider):
+    """Serialize API responses with orjson, which is much faster than the stdlib json."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for all routes
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 
 # Initialize the processor and cache manager once at startup
 processor = ResumeProcessor()
+cache_manager = CacheManager()
+# Concurrent duplicate uploads share one parse/screen call
+inflight = SingleFlight()
+
+
+def _get_or_parse(file, file_name):
+    """
+    Parse an uploaded resume through the parsed resume cache (file hash only).
+
+    Returns:
+        Tuple of (file_hash, parsed, parsed_cached)
+    """
+    file_hash = cache_manager.hash_file(file.stream)
+
+    parsed = cache_manager.get_parsed_resume(file_hash)
+    parsed_cached = parsed is not None
+    if not parsed_cached:
+        parsed = inflight.do(
+            ("parse", file_hash),
+            lambda: processor.parse_resume_from_bytes(file, file_name),
+        )
+        cache_manager.store_parsed_resume(file_hash, parsed)
+
+    return file_hash, parsed, parsed_cached
+
+
+def _screen(parsed, job_title, job_description, weights):
+    """
+    Screen a parsed resume.
+
+    Returns:
+        Tuple of (parsed with skills prepared for the job, screened)
+    """
+    screened = processor.screen_resume(parsed, job_title, job_description, weights)
+    return parsed, screened
+
+
+def _screen_and_optimise(parsed, job_title, job_description, weights):
+    """
+    Screen and optimize a parsed resume in a single LLM call.
+
+    Returns:
+        Tuple of (parsed with skills prepared for the job, screened,
+        optimization, whether the LLM response came from its cache)
+    """
+    screened, optimization = processor.screen_and_optimise_resume(
+        parsed, job_title, job_description, weights
+    )
+    optimization_cached = processor.screener.screen_and_optimize.last_call_cached()
+    return parsed, screened, optimization, optimization_cached
+
+
+def _parse_and_screen(file, file_name, job_title, job_description, weights):
+    """
+    Parse and screen an uploaded resume, going through both cache levels:
+    1. Parsed resume cache (file hash only)
+
+    Returns:
+        Tuple of (parsed, screened, cache_status)
+    """
+    file_hash, parsed, parsed_cached = _get_or_parse(file, file_name)
+
+    # 2. Screening result cache (file hash + job details). The parsed resume
+    # comes back with its skills prepared for this job, whether cached,
+    # screened here or shared from a concurrent identical request.
+    cached = cache_manager.get_screening_result(
+        file_hash, job_title, job_description, weights
+    )
+    screening_cached = cached is not None
+    if screening_cached:
+        parsed, screened = cached
+    else:
+        screening_key = cache_manager.screening_key(
+            file_hash, job_title, job_description, weights
+        )
+        parsed, screened = inflight.do(
+            ("screen", *screening_key),
+            lambda: _screen(parsed, job_title, job_description, weights),
+        )
+        cache_manager.store_screening_result(
+            file_hash, job_title, job_description, parsed, screened, weights
+        )
+
+    cache_status = {
+        "parsed_cached": parsed_cached,
+        "screening_cached": screening_cached,
+    }
+    return parsed, screened, cache_status
 
 
 @app.route("/api/parse", methods=["POST"])
@@ -52,25 +155,25 @@ def parse_resume():
                 400,
             )
 
-        # Read file bytes
-        file_bytes = file.read()
-
-        # Parse resume
-        parsed = processor.parse_resume_from_bytes(file_bytes, file_name)
+        # Return the cached parse for a previously seen file
+        file_hash, parsed, parsed_cached = _get_or_parse(file, file_name)
 
         return (
             jsonify(
                 {
                     "success": True,
                     "data": parsed,
-                    "cached": False
+                    "cached": parsed_cached
                 }
             ),
             200,
         )
 
+    except NotAResumeError as e:
+        return jsonify({"success": False, "error": str(e)}), 422
+
     except Exception as e:
-        logging.error(f"Error parsing resume: {e}")
+        logging.error("Error parsing resume: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 
@@ -124,28 +227,15 @@ def screen_resume():
         weights_str = request.form.get("weights")
         if weights_str:
             try:
-                weights = json.loads(weights_str)
-            except json.JSONDecodeError:
+                weights = orjson.loads(weights_str)
+            except orjson.JSONDecodeError:
                 return jsonify({"error": "Invalid JSON format for weights"}), 400
 
-        # Read file bytes
-        file_bytes = file.read()
-
         logging.info("Parsing and screening the resume and job description")
 
-        # Parse resume
-        parsed = processor.parse_resume_from_bytes(file_bytes, file_name)
-
-        # Store parsed resume in cache
-        # cache_manager.store_parsed_resume(file_hash, parsed)
-
-        # Screen resume
-        screened = processor.screen_resume(parsed, job_title, job_description, weights)
-
-        # Store screening result in cache
-        # cache_manager.store_screening_result(
-        #     file_hash, job_title, job_description, screened
-        # )
+        parsed, screened, cache_status = _parse_and_screen(
+            file, file_name, job_title, job_description, weights
+        )
 
         result = {"parsed": parsed, "screened": screened}
 
@@ -154,17 +244,17 @@ def screen_resume():
                 {
                     "success": True,
                     "data": result,
-                    "cache_status": {
-                        "parsed_cached": False,
-                        "screening_cached": False
-                    },
+                    "cache_status": cache_status,
                 }
             ),
             200,
         )
 
+    except NotAResumeError as e:
+        return jsonify({"success": False, "error": str(e)}), 422
+
     except Exception as e:
-        logging.error(f"Error screening resume: {e}")
+        logging.error("Error screening resume: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route("/api/optimize", methods=["POST"])
@@ -187,9 +277,6 @@ def optimize_resume():
                 ),
                 400,
             )
-        
-        # Read file bytes
-        file_bytes = file.read()
 
         # Get job details
         job_title = (request.form.get("job_title") or "").strip()
@@ -203,20 +290,41 @@ def optimize_resume():
         weights_str = request.form.get("weights")
         if weights_str:
             try:
-                weights = json.loads(weights_str)
-            except json.JSONDecodeError:
+                weights = orjson.loads(weights_str)
+            except orjson.JSONDecodeError:
                 return jsonify({"error": "Invalid JSON format for weights"}), 400
         
         logging.info("Parsing and screening the resume and job description")
 
-        # Parse resume
-        parsed = processor.parse_resume_from_bytes(file_bytes, file_name)
+        file_hash, parsed, parsed_cached = _get_or_parse(file, file_name)
 
-        # Screen resume
-        screened = processor.screen_resume(parsed, job_title, job_description, weights)
+        cached = cache_manager.get_screening_result(
+            file_hash, job_title, job_description, weights
+        )
+        screening_cached = cached is not None
+        if screening_cached:
+            # Optimize resume against the cached screening, using the resume
+            # as it was prepared for that screening
+            parsed, screened = cached
+            optimization_suggestions = processor.optimise_resume(parsed, job_title, job_description, screened)
+            optimization_cached = processor.optimizer.generate_suggestions.last_call_cached()
+        else:
+            # Screen and optimize resume in a single LLM call
+            screening_key = cache_manager.screening_key(
+                file_hash, job_title, job_description, weights
+            )
+            parsed, screened, optimization_suggestions, optimization_cached = inflight.do(
+                ("screen_and_optimize", *screening_key),
+                lambda: _screen_and_optimise(parsed, job_title, job_description, weights),
+            )
+            cache_manager.store_screening_result(
+                file_hash, job_title, job_description, parsed, screened, weights
+            )
 
-        # Optimize resume
-        optimization_suggestions = processor.optimise_resume(parsed, job_title, job_description, screened)
+        cache_status = {
+            "parsed_cached": parsed_cached,
+            "screening_cached": screening_cached,
+        }
 
         result = {"parsed": parsed, "screened": screened, "optimization": optimization_suggestions}
 
@@ -226,19 +334,110 @@ def optimize_resume():
                     "success": True,
                     "data": result,
                     "cache_status": {
-                        "parsed_cached": False,
-                        "screening_cached": False,
-                        "optimization_cached": False
+                        **cache_status,
+                        "optimization_cached": optimization_cached
                     },
                 }
             ),
             200,
         )
 
+    except NotAResumeError as e:
+        return jsonify({"success": False, "error": str(e)}), 422
+
+    except Exception as e:
+        logging.error("Error screening resume: %s", e)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route("/api/optimize/stream", methods=["POST"])
+def optimize_resume_stream():
+    """
+    Parse, screen and optimize a resume, streaming results as NDJSON.
+
+    Each line is a JSON object with a "stage" key:
+    - {"stage": "parsed", "data": ..., "cached": bool}
+    - {"stage": "screened", "data": ..., "cached": bool}
+    - {"stage": "optimization", "data": ..., "done": bool} (repeated as
+      suggestions are generated; the line with "done": true is final)
+    - {"stage": "error", "error": ...} if optimization fails midway
+
+    Request: same form fields as /api/optimize
+    """
+    # Check if file is present
+    if "file" not in request.files:
+        return jsonify({"error": "No file provided"}), 400
+
+    file = request.files["file"]
+    file_name = (file.filename or "").strip()
+    if not file_name:
+        return jsonify({"error": "No file selected"}), 400
+
+    # Check file extension
+    if not file_name.lower().endswith((".pdf", ".docx", ".doc")):
+        return (
+            jsonify(
+                {"error": "Invalid file format. Only PDF and DOCX are supported"}
+            ),
+            400,
+        )
+
+    # Get job details
+    job_title = (request.form.get("job_title") or "").strip()
+    job_description = (request.form.get("job_description") or "").strip()
+
+    if not job_title or not job_description:
+        return jsonify({"error": "job_title and job_description are required"}), 400
+
+    # Optional: Custom weights
+    weights = None
+    weights_str = request.form.get("weights")
+    if weights_str:
+        try:
+            weights = orjson.loads(weights_str)
+        except orjson.JSONDecodeError:
+            return jsonify({"error": "Invalid JSON format for weights"}), 400
+
+    # The upload has to be consumed before the response starts streaming
+    try:
+        parsed, screened, cache_status = _parse_and_screen(
+            file, file_name, job_title, job_description, weights
+        )
+    except NotAResumeError as e:
+        return jsonify({"success": False, "error": str(e)}), 422
     except Exception as e:
-        logging.error(f"Error screening resume: {e}")
+        logging.error("Error screening resume: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
+    def ndjson(payload):
+        return orjson.dumps(payload, default=str) + b"\n"
+
+    def generate():
+        try:
+            yield ndjson(
+                {"stage": "parsed", "data": parsed, "cached": cache_status["parsed_cached"]}
+            )
+            yield ndjson(
+                {"stage": "screened", "data": screened, "cached": cache_status["screening_cached"]}
+            )
+
+            # Hold each snapshot back one step: the last one is the
+            # validated result and goes out as the "done" line
+            previous = None
+            for optimization in processor.stream_optimise_resume(
+                parsed, job_title, job_description, screened
+            ):
+                if previous is not None:
+                    yield ndjson({"stage": "optimization", "data": previous, "done": False})
+                previous = optimization
+            yield ndjson({"stage": "optimization", "data": previous, "done": True})
+
+        except Exception as e:
+            logging.error("Error streaming resume optimization: %s", e)
+            yield ndjson({"stage": "error", "error": str(e)})
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
 
 @app.route("/api/health", methods=["GET"])
 def health():
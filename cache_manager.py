@@ -0,0 +1,187 @@
+"""
+In-memory caching for the resume processing API.
+Two cache levels:
+1. Parsed resumes, keyed by the hash of the uploaded file
+2. Screening results, keyed by the file hash plus the job details and weights,
+   stored with the resume as prepared (skills normalized/expanded) for that job
+Plus SingleFlight, which collapses concurrent identical requests into one call.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, BinaryIO, Callable, Dict, Hashable, Optional, Tuple
+
+from cachetools import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Read uploads in 1 MiB chunks when hashing so large files are never fully buffered
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class CacheManager:
+    """
+    LRU caches for parsed resumes and screening results.
+    Values are deep-copied on the way in and out because the processing
+    pipeline mutates parsed resume dicts in place.
+    """
+
+    def __init__(self, max_parsed: int = 256, max_screened: int = 1024):
+        """
+        Initialize the cache manager.
+
+        Args:
+            max_parsed: Maximum number of parsed resumes to keep
+            max_screened: Maximum number of screening results to keep
+        """
+        self._parsed: LRUCache = LRUCache(maxsize=max_parsed)
+        self._screened: LRUCache = LRUCache(maxsize=max_screened)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def hash_bytes(file_bytes: bytes) -> str:
+        """Hash raw file bytes."""
+        return hashlib.blake2b(file_bytes, digest_size=32).hexdigest()
+
+    @staticmethod
+    def hash_file(file_obj: BinaryIO) -> str:
+        """
+        Hash a file object chunk by chunk and rewind it afterwards,
+        so it can still be saved or read by the caller.
+        """
+        hasher = hashlib.blake2b(digest_size=32)
+        file_obj.seek(0)
+        for chunk in iter(lambda: file_obj.read(HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+        file_obj.seek(0)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _job_key(
+        job_title: str, job_description: str, weights: Optional[Dict[str, float]]
+    ) -> str:
+        """Hash the job details and weights into a compact key."""
+        weights_json = json.dumps(weights, sort_keys=True) if weights else ""
+        payload = "\0".join([job_title, job_description, weights_json])
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=20).hexdigest()
+
+    def screening_key(
+        self,
+        file_hash: str,
+        job_title: str,
+        job_description: str,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> Tuple[str, str]:
+        """Key identifying a screening of a file against a job."""
+        return (file_hash, self._job_key(job_title, job_description, weights))
+
+    def get_parsed_resume(self, file_hash: str) -> Optional[Dict]:
+        """Return a cached parsed resume, or None on a miss."""
+        with self._lock:
+            parsed = self._parsed.get(file_hash)
+        if parsed is None:
+            return None
+        logger.info("Parsed resume cache hit: %s", file_hash[:12])
+        return copy.deepcopy(parsed)
+
+    def store_parsed_resume(self, file_hash: str, parsed: Dict) -> None:
+        """Cache a parsed resume."""
+        parsed = copy.deepcopy(parsed)
+        with self._lock:
+            self._parsed[file_hash] = parsed
+
+    def get_screening_result(
+        self,
+        file_hash: str,
+        job_title: str,
+        job_description: str,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> Optional[Tuple[Dict, Dict]]:
+        """
+        Return a cached (prepared parsed resume, screening result) pair,
+        or None on a miss.
+        """
+        key = self.screening_key(file_hash, job_title, job_description, weights)
+        with self._lock:
+            entry = self._screened.get(key)
+        if entry is None:
+            return None
+        logger.info("Screening result cache hit: %s", file_hash[:12])
+        return copy.deepcopy(entry)
+
+    def store_screening_result(
+        self,
+        file_hash: str,
+        job_title: str,
+        job_description: str,
+        parsed: Dict,
+        screened: Dict,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """
+        Cache a screening result together with the parsed resume it was
+        screened from (skills already prepared for this job).
+        """
+        key = self.screening_key(file_hash, job_title, job_description, weights)
+        entry = copy.deepcopy((parsed, screened))
+        with self._lock:
+            self._screened[key] = entry
+
+
+class _InFlightCall:
+    """A call in progress, shared by every request waiting on its key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into a single execution.
+    Unlike the caches, this helps requests that arrive while the first one is
+    still running (e.g. a recruiter double-clicking submit). Only calls within
+    one process are coalesced.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn, or wait for the in-flight call with the same key and share its
+        result. Waiters get deep copies of a snapshot taken before the leader
+        gets its result back, so anyone can mutate theirs freely; if the call
+        fails, every waiter sees the same exception.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _InFlightCall()
+                self._calls[key] = call
+
+        if not is_leader:
+            logger.info("Joining in-flight request: %s", key)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        else:
+            call.result = copy.deepcopy(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
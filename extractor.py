@@ -0,0 +1,331 @@
+"""
+Resume text extraction
+Pulls text and hyperlink URLs out of PDF and DOCX resumes, and runs that work
+in a small process pool. Kept free of LLM imports so the pool's processes
+stay light.
+"""
+
+import ctypes
+import io
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import BinaryIO, Callable, List, Optional, Tuple, Union
+
+import docx
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+logger = logging.getLogger(__name__)
+
+
+class ResumeExtractor:
+    """Handles extraction of text and URLs from resume files (PDF, DOCX)."""
+
+    @staticmethod
+    def _extract_pdf(file_path: Union[str, BinaryIO]) -> Tuple[str, List[str]]:
+        """
+        Extract page text and hyperlink URLs from a PDF in a single pass,
+        so every page is loaded only once.
+        """
+        pdf = pdfium.PdfDocument(file_path)
+        text_parts: List[str] = []
+        urls: List[str] = []
+        seen_urls = set()
+        try:
+            for page in pdf:
+                try:
+                    page_text = page.get_textpage().get_text_bounded()
+                except Exception:
+                    page_text = None
+                text_parts.append(page_text or "")
+
+                # One try per page: a broken page loses its links, not the document's
+                try:
+                    for url in ResumeExtractor._extract_urls_from_pdf_page(pdf, page):
+                        if url not in seen_urls:
+                            seen_urls.add(url)
+                            urls.append(url)
+                except Exception as e:
+                    logger.warning("Could not extract URLs from PDF page: %s", e)
+        finally:
+            pdf.close()
+
+        return "\n".join(text_parts), urls
+
+    @staticmethod
+    def _extract_urls_from_pdf_page(pdf: pdfium.PdfDocument, page: pdfium.PdfPage) -> List[str]:
+        """Extract URLs from the link annotations of a single PDF page."""
+        urls = []
+        pos = ctypes.c_int(0)
+        link = pdfium_c.FPDF_LINK()
+        while pdfium_c.FPDFLink_Enumerate(page.raw, ctypes.byref(pos), ctypes.byref(link)):
+            # PDFium resolves the /A action dictionary itself, no xref walking needed
+            action = pdfium_c.FPDFLink_GetAction(link)
+            if not action or pdfium_c.FPDFAction_GetType(action) != pdfium_c.PDFACTION_URI:
+                continue
+
+            # First call returns the buffer size, second call fills it
+            size = pdfium_c.FPDFAction_GetURIPath(pdf.raw, action, None, 0)
+            if not size:
+                continue
+            buffer = ctypes.create_string_buffer(size)
+            pdfium_c.FPDFAction_GetURIPath(pdf.raw, action, buffer, size)
+            url = buffer.value.decode("utf-8", errors="replace")
+            if url:
+                urls.append(url)
+        return urls
+
+    @staticmethod
+    def extract_urls_from_pdf(file_path: Union[str, BinaryIO]) -> List[str]:
+        """Extract URLs from PDF hyperlinks/annotations (path or binary stream)."""
+        try:
+            _, urls = ResumeExtractor._extract_pdf(file_path)
+        except Exception as e:
+            logger.warning("Could not extract URLs from PDF: %s", e)
+            return []
+        return urls
+    
+    @staticmethod
+    def _extract_urls_from_docx_document(doc) -> List[str]:
+        """Extract URLs from the hyperlinks of an already opened DOCX document."""
+        urls = []
+        try:
+            # Get all hyperlinks from the document relationships
+            rels = doc.part.rels
+            for rel in rels.values():
+                if "hyperlink" in rel.reltype:
+                    url = rel.target_ref
+                    if url and url not in urls:
+                        # Filter out internal anchors (starting with #)
+                        if not url.startswith("#"):
+                            urls.append(url)
+        except Exception as e:
+            logger.warning("Could not extract URLs from DOCX: %s", e)
+
+        return urls
+
+    @staticmethod
+    def extract_urls_from_docx(file_path: Union[str, BinaryIO]) -> List[str]:
+        """Extract URLs from DOCX hyperlinks (path or binary stream)."""
+        try:
+            doc = docx.Document(file_path)
+        except Exception as e:
+            logger.warning("Could not extract URLs from DOCX: %s", e)
+            return []
+        return ResumeExtractor._extract_urls_from_docx_document(doc)
+    
+    @staticmethod
+    def extract_text_from_pdf(file_path: Union[str, BinaryIO]) -> str:
+        """Extract text and URLs from PDF file (path or binary stream)."""
+        text, urls = ResumeExtractor._extract_pdf(file_path)
+
+        # Append URLs from hyperlinks
+        if urls:
+            text += "\n\nEXTRACTED URLS/LINKS:\n"
+            for url in urls:
+                text += f"- {url}\n"
+
+        return text
+
+    @staticmethod
+    def extract_text_from_docx(file_path: Union[str, BinaryIO]) -> str:
+        """Extract text and URLs from DOCX file (path or binary stream)."""
+        # Open the document once and reuse it for both text and hyperlinks
+        doc = docx.Document(file_path)
+        text = "\n".join([paragraph.text or "" for paragraph in doc.paragraphs])
+
+        # Also extract URLs from hyperlinks
+        urls = ResumeExtractor._extract_urls_from_docx_document(doc)
+        if urls:
+            text += "\n\nEXTRACTED URLS/LINKS:\n"
+            for url in urls:
+                text += f"- {url}\n"
+
+        return text
+
+    @staticmethod
+    def extract_text_from_pdf_bytes(file_bytes: bytes) -> str:
+        """Extract text and URLs from PDF bytes (for file uploads)."""
+        # PDFium reads in-memory streams, so no temporary file is needed
+        return ResumeExtractor.extract_text_from_pdf(io.BytesIO(file_bytes))
+
+    @staticmethod
+    def extract_text_from_docx_bytes(file_bytes: bytes) -> str:
+        """Extract text and URLs from DOCX bytes (for file uploads)."""
+        return ResumeExtractor.extract_text_from_docx(io.BytesIO(file_bytes))
+    # ...existing code...
+    @staticmethod
+    def extract_text_from_bytes(file_bytes: bytes, filename: str) -> str:
+        """
+        Extract text from file bytes (for file uploads).
+        Auto-detects file type based on filename extension.
+        """
+        extension = Path(filename).suffix.lower()
+
+        if extension == ".pdf":
+            logger.info("Extracting text from uploaded PDF: %s", filename)
+            return ResumeExtractor.extract_text_from_pdf_bytes(file_bytes)
+        elif extension in [".docx", ".doc"]:
+            logger.info("Extracting text from uploaded DOCX: %s", filename)
+            return ResumeExtractor.extract_text_from_docx_bytes(file_bytes)
+        else:
+            raise ValueError(
+                f"Unsupported file format: {extension}. Supported formats: .pdf, .docx, .doc"
+            )
+
+    @staticmethod
+    def extract_text_from_stream(
+        file_storage, filename: str, in_pool: bool = False
+    ) -> str:
+        """
+        Extract text from an uploaded file object (e.g. Werkzeug FileStorage).
+        The upload is streamed straight to a temporary file and parsed from
+        disk, so the whole file is never buffered in memory as bytes.
+        If in_pool is set, the parsing runs in the extraction process pool.
+        """
+        extension = Path(filename).suffix.lower()
+
+        if extension not in [".pdf", ".docx", ".doc"]:
+            raise ValueError(
+                f"Unsupported file format: {extension}. Supported formats: .pdf, .docx, .doc"
+            )
+
+        tmp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as tmp:
+                tmp_path = tmp.name
+
+            file_storage.save(tmp_path)
+
+            if extension == ".pdf":
+                logger.info("Extracting text from uploaded PDF: %s", filename)
+                extract = ResumeExtractor.extract_text_from_pdf
+            else:
+                logger.info("Extracting text from uploaded DOCX: %s", filename)
+                extract = ResumeExtractor.extract_text_from_docx
+
+            if in_pool:
+                return run_in_extract_pool(extract, tmp_path)
+            return extract(tmp_path)
+        finally:
+            if tmp_path:
+                try:
+                    os.remove(tmp_path)
+                except Exception:
+                    pass
+
+    @staticmethod
+    def extract_text_from_file(file_path: str) -> str:
+        """
+        Extract text from a resume file (PDF or DOCX).
+        Auto-detects file type based on extension.
+        """
+        file_path_obj = Path(file_path)
+
+        if not file_path_obj.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        extension = file_path_obj.suffix.lower()
+
+        if extension == ".pdf":
+            logger.info("Extracting text from PDF: %s", file_path)
+            return ResumeExtractor.extract_text_from_pdf(file_path)
+        elif extension in [".docx", ".doc"]:
+            logger.info("Extracting text from DOCX: %s", file_path)
+            return ResumeExtractor.extract_text_from_docx(file_path)
+        else:
+            raise ValueError(
+                f"Unsupported file format: {extension}. Supported formats: .pdf, .docx, .doc"
+            )
+
+
+# Text extraction is CPU-bound, so it runs in worker processes (outside the
+# GIL) instead of on the request thread. Created lazily so every gunicorn
+# worker builds its own pool after forking. Every gunicorn worker gets its own
+# pool, so keep it small: the workers between them already cover the cores.
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", min(2, os.cpu_count() or 1)))
+
+# Longest a single document may take; a PDF that hangs PDFium must not pin a
+# request thread forever
+EXTRACT_TIMEOUT = float(os.getenv("EXTRACT_TIMEOUT", "60"))
+
+_EXTRACT_POOL: Optional[ProcessPoolExecutor] = None
+_EXTRACT_POOL_LOCK = threading.Lock()
+
+
+def _extract_mp_context():
+    """
+    Start method for the extraction pool. The pool is started from a request
+    thread of a multi-threaded worker, and forking that process could copy
+    locks held by other threads, so a forkserver (preloaded with this module
+    only) is used where the platform has one. Elsewhere (e.g. Windows, which
+    only has spawn) the platform default is used.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context("forkserver")
+        mp_context.set_forkserver_preload([__name__])
+        return mp_context
+    return multiprocessing.get_context()
+
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    """Return the shared text extraction process pool, creating it on first use."""
+    global _EXTRACT_POOL
+    if _EXTRACT_POOL is None:
+        with _EXTRACT_POOL_LOCK:
+            if _EXTRACT_POOL is None:
+                _EXTRACT_POOL = ProcessPoolExecutor(
+                    max_workers=EXTRACT_WORKERS, mp_context=_extract_mp_context()
+                )
+    return _EXTRACT_POOL
+
+
+def _discard_extract_pool(pool: ProcessPoolExecutor, kill: bool = False) -> None:
+    """
+    Drop a pool that can no longer be used, so the next call builds a fresh one.
+    With kill, its processes are stopped too (e.g. one stuck on a hung PDF).
+    """
+    global _EXTRACT_POOL
+    with _EXTRACT_POOL_LOCK:
+        if _EXTRACT_POOL is pool:
+            _EXTRACT_POOL = None
+    if kill:
+        # ProcessPoolExecutor has no public way to stop a running task
+        for process in list((pool._processes or {}).values()):
+            process.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_in_extract_pool(fn: Callable[..., str], *args) -> str:
+    """
+    Run an extraction function in the process pool and return its text.
+
+    If a pool process died (a PDFium crash, the OOM killer), the broken pool is
+    replaced and the call retried once. A call taking longer than
+    EXTRACT_TIMEOUT raises TimeoutError and the pool is replaced.
+    """
+    for attempt in (1, 2):
+        pool = _get_extract_pool()
+        try:
+            future = pool.submit(fn, *args)
+            return future.result(timeout=EXTRACT_TIMEOUT)
+        except BrokenProcessPool:
+            _discard_extract_pool(pool)
+            if attempt == 2:
+                raise
+            logger.warning("Text extraction pool broke, retrying on a fresh pool")
+        except TimeoutError:
+            _discard_extract_pool(pool, kill=True)
+            raise TimeoutError(
+                f"Text extraction took longer than {EXTRACT_TIMEOUT:g}s"
+            ) from None
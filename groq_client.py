@@ -0,0 +1,134 @@
+"""
+Shared Groq client
+Builds one Groq client (and its Instructor wrapper) per API key and reuses it
+across ResumeParser, ResumeScreener and ResumeOptimizer, so every LLM call
+goes through the same warm HTTP connection pool.
+"""
+
+import instructor
+import httpx
+import orjson
+from cachetools import LRUCache
+from groq import Groq, DefaultHttpxClient
+from pydantic import BaseModel
+from typing import Callable, Dict, Type, TypeVar
+import copy
+import functools
+import hashlib
+import logging
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Connection pool shared by all requests hitting api.groq.com
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+
+T = TypeVar("T", bound=BaseModel)
+
+_INSTRUCTOR_CLIENTS: Dict[str, instructor.Instructor] = {}
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_instructor_client(api_key: str = "") -> instructor.Instructor:
+    """
+    Return the shared Instructor-wrapped Groq client for an API key.
+
+    Args:
+        api_key: Groq API key (defaults to GROQ_API_KEY env var)
+    """
+    api_key_value = api_key or os.getenv("GROQ_API_KEY") or ""
+
+    client = _INSTRUCTOR_CLIENTS.get(api_key_value)
+    if client is not None:
+        return client
+
+    with _CLIENT_LOCK:
+        client = _INSTRUCTOR_CLIENTS.get(api_key_value)
+        if client is None:
+            groq_client = Groq(
+                api_key=api_key_value or None,
+                http_client=DefaultHttpxClient(limits=HTTP_LIMITS),
+            )
+            client = instructor.from_groq(groq_client, mode=instructor.Mode.JSON)
+            _INSTRUCTOR_CLIENTS[api_key_value] = client
+            logger.info("Initialized shared Groq client")
+    return client
+
+
+def cached_response_model(model: Type[T]) -> Type[T]:
+    """
+    Prepare a response model for Instructor once at import time.
+
+    Instructor wraps plain Pydantic models in a freshly created OpenAISchema
+    subclass and regenerates their JSON schema on every request. The returned
+    subclass already inherits OpenAISchema (so no wrapping happens per call)
+    and serves a precomputed copy of the model's JSON schema.
+
+    Args:
+        model: Pydantic model used as response_model
+    """
+    schema = model.model_json_schema()
+
+    class CachedSchemaModel(model, instructor.OpenAISchema):
+        @classmethod
+        def model_json_schema(cls, *args, **kwargs):
+            if args or kwargs:
+                return super().model_json_schema(*args, **kwargs)
+            return copy.deepcopy(schema)
+
+    CachedSchemaModel.__name__ = model.__name__
+    CachedSchemaModel.__qualname__ = model.__qualname__
+    CachedSchemaModel.__doc__ = model.__doc__
+    return CachedSchemaModel
+
+
+def memoize_response(response_model: Type[T], maxsize: int = 2048) -> Callable:
+    """
+    Memoize an LLM-backed method on the content of its arguments.
+
+    The key is a hash of the sorted-key JSON of the arguments plus the
+    instance's model and temperature, so a replayed request with the same
+    resume and job details skips the Groq call. Results are stored as plain
+    dicts and rebuilt into response_model on a hit; failures are not cached.
+    The wrapper's last_call_cached() tells whether the calling thread's most
+    recent call was served from the cache.
+
+    Args:
+        response_model: Pydantic model the method returns
+        maxsize: Maximum number of results to keep
+    """
+    cache: LRUCache = LRUCache(maxsize=maxsize)
+    lock = threading.Lock()
+    local = threading.local()
+
+    def decorator(method: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs) -> T:
+            payload = orjson.dumps(
+                (method.__name__, self.model, self.temperature, args, kwargs),
+                option=orjson.OPT_SORT_KEYS,
+                default=str,
+            )
+            key = hashlib.blake2b(payload, digest_size=32).hexdigest()
+
+            with lock:
+                cached = cache.get(key)
+            local.hit = cached is not None
+            if cached is not None:
+                logger.info("LLM response cache hit for %s", method.__name__)
+                return response_model.model_validate(cached)
+
+            result = method(self, *args, **kwargs)
+            with lock:
+                cache[key] = result.model_dump()
+            return result
+
+        wrapper.cache = cache
+        wrapper.last_call_cached = lambda: getattr(local, "hit", False)
+        return wrapper
+
+    return decorator
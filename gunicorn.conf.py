@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration for the resume processing API.
+Run with: gunicorn -c gunicorn.conf.py app:app
+
+Requests spend almost all their time waiting on Groq, so each worker
+process runs a pool of threads to keep many LLM calls in flight at once.
+The app is not preloaded: each worker imports app.py after forking and
+builds its own ResumeProcessor and Groq connection pool.
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Only warnings and errors from the app in production (workers inherit this)
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+# Parse + screen + optimize can take well over gunicorn's default 30s
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "180"))
+keepalive = 30
+
+preload_app = False
+accesslog = "-"
@@ -1,201 +1,59 @@
-import PyPDF2
-import docx
-import io
-from typing import List, Dict, Optional, Union, BinaryIO
+import copy
+import hashlib
+import re
+import threading
+from typing import List, Dict, Optional, Union, BinaryIO, Tuple, Iterator
 import logging
-from pathlib import Path
-import tempfile
 import os
+from extractor import ResumeExtractor, run_in_extract_pool
 from parser import ResumeParser
 from screener import ResumeScreener
 from resume_optimizer import ResumeOptimizer
 import utils
+from cachetools import LRUCache
 
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
-# ...existing code...
-class ResumeExtractor:
-    """Handles extraction of text and URLs from resume files (PDF, DOCX)."""
 
-    @staticmethod
-    def extract_urls_from_pdf(file_path: str) -> List[str]:
-        """Extract URLs from PDF hyperlinks/annotations."""
-        urls = []
-        try:
-            with open(file_path, "rb") as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    annotations = page.get("/Annots")
-                    if not annotations:
-                        continue
-
-                    # Ensure iterable
-                    if not isinstance(annotations, list):
-                        annotations = [annotations]
-
-                    for annotation_ref in annotations:
-                        try:
-                            annotation = annotation_ref.get_object()
-                        except Exception:
-                            continue
-
-                        if annotation.get("/Subtype") != "/Link":
-                            continue
-
-                        action = annotation.get("/A")
-                        if not action:
-                            continue
-
-                        try:
-                            action = action.get_object()
-                        except Exception:
-                            pass
-
-                        uri = action.get("/URI") if isinstance(action, dict) else None
-                        if uri:
-                            url = uri if isinstance(uri, str) else str(uri)
-                            if url not in urls:
-                                urls.append(url)
-        except Exception as e:
-            logger.warning(f"Could not extract URLs from PDF: {e}")
-
-        return urls
-    
-    @staticmethod
-    def extract_urls_from_docx(file_path: str) -> List[str]:
-        """Extract URLs from DOCX hyperlinks."""
-        urls = []
-        try:
-            doc = docx.Document(file_path)
-            # Get all hyperlinks from the document relationships
-            rels = doc.part.rels
-            for rel in rels.values():
-                if "hyperlink" in rel.reltype:
-                    url = rel.target_ref
-                    if url and url not in urls:
-                        # Filter out internal anchors (starting with #)
-                        if not url.startswith("#"):
-                            urls.append(url)
-        except Exception as e:
-            logger.warning(f"Could not extract URLs from DOCX: {e}")
-
-        return urls
-    
-    @staticmethod
-    def extract_text_from_pdf(file_path: str) -> str:
-        """Extract text and URLs from PDF file."""
-        with open(file_path, "rb") as file:
-            reader = PyPDF2.PdfReader(file)
-            text_parts: List[str] = []
-            for page in reader.pages:
-                try:
-                    page_text = page.extract_text()
-                except Exception:
-                    page_text = None
-                text_parts.append(page_text or "")
-
-            text = "\n".join(text_parts)
-
-            # Also extract URLs from hyperlinks
-            urls = ResumeExtractor.extract_urls_from_pdf(file_path)
-            if urls:
-                text += "\n\nEXTRACTED URLS/LINKS:\n"
-                for url in urls:
-                    text += f"- {url}\n"
-
-            return text
+# Cheap pre-filter so obvious non-resumes never reach the LLM
+MIN_RESUME_CHARS = 200
+RESUME_SECTION_RE = re.compile(r"experience|education|skills|project", re.IGNORECASE)
 
-    @staticmethod
-    def extract_text_from_docx(file_path: str) -> str:
-        """Extract text and URLs from DOCX file."""
-        doc = docx.Document(file_path)
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
 
-        # Also extract URLs from hyperlinks
-        urls = ResumeExtractor.extract_urls_from_docx(file_path)
-        if urls:
-            text += "\n\nEXTRACTED URLS/LINKS:\n"
-            for url in urls:
-                text += f"- {url}\n"
+class NotAResumeError(ValueError):
+    """Raised when extracted text does not look like a resume."""
 
-        return text
 
-    @staticmethod
-    def extract_text_from_pdf_bytes(file_bytes: bytes) -> str:
-        """Extract text and URLs from PDF bytes (for file uploads)."""
-        # Write bytes to a temporary file so URL extraction (which relies on file path)
-        # can reuse file-based logic that resolves annotations reliably.
-        tmp_path = None
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                tmp.write(file_bytes)
-                tmp_path = tmp.name
-
-            # Use the file-based extractor (it calls extract_urls_from_pdf)
-            return ResumeExtractor.extract_text_from_pdf(tmp_path)
-        finally:
-            if tmp_path:
-                try:
-                    os.remove(tmp_path)
-                except Exception:
-                    pass
+def looks_like_resume(resume_text: str) -> bool:
+    """Return False for text too short or lacking any typical resume section."""
+    return (
+        len(resume_text) >= MIN_RESUME_CHARS
+        and RESUME_SECTION_RE.search(resume_text) is not None
+    )
 
-    @staticmethod
-    def extract_text_from_docx_bytes(file_bytes: bytes) -> str:
-        """Extract text and URLs from DOCX bytes (for file uploads)."""
-        file_obj = io.BytesIO(file_bytes)
-        doc = docx.Document(file_obj)
-        text = "\n".join([paragraph.text or "" for paragraph in doc.paragraphs])
-        return text
-    # ...existing code...
-    @staticmethod
-    def extract_text_from_bytes(file_bytes: bytes, filename: str) -> str:
-        """
-        Extract text from file bytes (for file uploads).
-        Auto-detects file type based on filename extension.
-        """
-        extension = Path(filename).suffix.lower()
-
-        if extension == ".pdf":
-            logger.info(f"Extracting text from uploaded PDF: {filename}")
-            return ResumeExtractor.extract_text_from_pdf_bytes(file_bytes)
-        elif extension in [".docx", ".doc"]:
-            logger.info(f"Extracting text from uploaded DOCX: {filename}")
-            return ResumeExtractor.extract_text_from_docx_bytes(file_bytes)
-        else:
-            raise ValueError(
-                f"Unsupported file format: {extension}. Supported formats: .pdf, .docx, .doc"
-            )
-
-    @staticmethod
-    def extract_text_from_file(file_path: str) -> str:
-        """
-        Extract text from a resume file (PDF or DOCX).
-        Auto-detects file type based on extension.
-        """
-        file_path_obj = Path(file_path)
-
-        if not file_path_obj.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-
-        extension = file_path_obj.suffix.lower()
-
-        if extension == ".pdf":
-            logger.info(f"Extracting text from PDF: {file_path}")
-            return ResumeExtractor.extract_text_from_pdf(file_path)
-        elif extension in [".docx", ".doc"]:
-            logger.info(f"Extracting text from DOCX: {file_path}")
-            return ResumeExtractor.extract_text_from_docx(file_path)
-        else:
-            raise ValueError(
-                f"Unsupported file format: {extension}. Supported formats: .pdf, .docx, .doc"
-            )
 
 class ResumeProcessor:
     """
     Main class for processing resumes - parsing and screening.
     Designed for easy integration with Flask/FastAPI backends.
     """
+    # Keys that validation expects to be objects (not raw strings)
+    _SCREENING_OBJECT_KEYS = (
+        "project_match",
+        "education_match",
+        "experience_match",
+        "skill_match",
+        "cultural_fit",
+    )
+
+    # How to wrap each non-object value type; dicts/objects are left as-is
+    _SCREENING_VALUE_WRAPPERS = {
+        str: lambda val: {"text": val},
+        # keep original items but embed them
+        list: lambda val: {"items": val},
+        type(None): lambda val: {},
+    }
+
     @staticmethod
     def _normalize_screening_result(result: Dict) -> Dict:
         """
@@ -207,33 +65,21 @@ class ResumeProcessor:
         if not isinstance(result, dict):
             return result
 
-        # Keys that validation expects to be objects (not raw strings)
-        object_keys = [
-            "project_match",
-            "education_match",
-            "experience_match",
-            "skill_match",
-            "cultural_fit",
-        ]
-
-        for key in object_keys:
-            if key in result:
-                val = result[key]
-                if isinstance(val, str):
-                    result[key] = {"text": val}
-                elif isinstance(val, list):
-                    # keep original items but embed them
-                    result[key] = {"items": val}
-                elif val is None:
-                    result[key] = {}
-                # if already a dict/object, leave as-is
-        # Ensure overall_score is numeric (some tools expect a number)
-        if "overall_score" in result:
+        wrappers = ResumeProcessor._SCREENING_VALUE_WRAPPERS
+        for key in ResumeProcessor._SCREENING_OBJECT_KEYS:
+            # Missing keys resolve to Ellipsis, which has no wrapper
+            val = result.get(key, ...)
+            wrap = wrappers.get(type(val))
+            if wrap is not None:
+                result[key] = wrap(val)
+
+        # Ensure overall_score is numeric (some tools expect a number);
+        # numeric scores are preserved, strings that look like numbers coerced
+        overall_score = result.get("overall_score")
+        if isinstance(overall_score, str):
             try:
-                # preserve numeric if already numeric; coerce strings that look like numbers
-                if isinstance(result["overall_score"], str):
-                    result["overall_score"] = float(result["overall_score"])
-            except Exception:
+                result["overall_score"] = float(overall_score)
+            except ValueError:
                 # if coercion fails, drop it to avoid validation issues
                 result.pop("overall_score", None)
 
@@ -244,6 +90,7 @@ class ResumeProcessor:
         parser_model: str = "llama-3.3-70b-versatile",
         screener_model: str = "llama-3.3-70b-versatile",
         optimizer_model: str = "llama-3.3-70b-versatile",
+        parsed_text_cache_size: int = 256,
     ):
         """
         Initialize the resume processor.
@@ -251,11 +98,42 @@ class ResumeProcessor:
         Args:
             parser_model: Groq model for parsing resumes
             screener_model: Groq model for screening resumes
+            optimizer_model: Groq model for optimization suggestions
+            parsed_text_cache_size: Number of parsed resumes to keep, keyed by text
         """
         self.parser = ResumeParser(model=parser_model)
         self.screener = ResumeScreener(model=screener_model)
         self.optimizer = ResumeOptimizer(model=optimizer_model)
         self.extractor = ResumeExtractor()
+        # Parsed resumes keyed by a hash of their normalized text
+        self._parsed_text_cache: LRUCache = LRUCache(maxsize=parsed_text_cache_size)
+        self._parsed_text_lock = threading.Lock()
+
+    def _parse_resume_text(self, resume_text: str) -> Dict:
+        """
+        Parse extracted resume text with the LLM, skipping the Groq call for
+        documents that are not resumes and for text parsed before.
+        """
+        if not looks_like_resume(resume_text):
+            raise NotAResumeError("Document does not appear to be a resume")
+
+        # Key on normalized whitespace so re-exports of the same resume hit
+        text_key = hashlib.blake2b(
+            " ".join(resume_text.split()).lower().encode("utf-8"), digest_size=20
+        ).hexdigest()
+        with self._parsed_text_lock:
+            cached = self._parsed_text_cache.get(text_key)
+        if cached is not None:
+            logger.info("Resume text seen before, reusing parsed result")
+            return copy.deepcopy(cached)
+
+        parsed_resume = self.parser.parse_resume(resume_text)
+        logger.info("Resume parsed successfully")
+
+        parsed = parsed_resume.model_dump(exclude_none=True)
+        with self._parsed_text_lock:
+            self._parsed_text_cache[text_key] = copy.deepcopy(parsed)
+        return parsed
 
     def parse_resume_from_path(self, file_path: str) -> Dict:
         """
@@ -267,34 +145,64 @@ class ResumeProcessor:
         Returns:
             Parsed resume as dictionary
         """
-        resume_text = self.extractor.extract_text_from_file(file_path)
-        logger.info(f"Extracted {len(resume_text)} characters from {file_path}")
-
-        parsed_resume = self.parser.parse_resume(resume_text)
-        logger.info("Resume parsed successfully")
+        resume_text = run_in_extract_pool(ResumeExtractor.extract_text_from_file, file_path)
+        logger.info("Extracted %d characters from %s", len(resume_text), file_path)
 
-        return parsed_resume.model_dump(exclude_none=True)
+        return self._parse_resume_text(resume_text)
 
-    def parse_resume_from_bytes(self, file_bytes: bytes, filename: str) -> Dict:
+    def parse_resume_from_bytes(
+        self, file_bytes: Union[bytes, BinaryIO], filename: str
+    ) -> Dict:
         """
-        Parse resume from file bytes (for file uploads).
+        Parse resume from file bytes or an uploaded file object (for file uploads).
 
         Args:
-            file_bytes: File content as bytes
+            file_bytes: File content as bytes, or a file object with a
+                        ``save(path)`` method (e.g. Flask's FileStorage)
             filename: Original filename (for extension detection)
 
         Returns:
             Parsed resume as dictionary
         """
-        resume_text = self.extractor.extract_text_from_bytes(file_bytes, filename)
+        if isinstance(file_bytes, (bytes, bytearray)):
+            resume_text = run_in_extract_pool(
+                ResumeExtractor.extract_text_from_bytes, bytes(file_bytes), filename
+            )
+        else:
+            resume_text = self.extractor.extract_text_from_stream(
+                file_bytes, filename, in_pool=True
+            )
         logger.info(
-            f"Extracted {len(resume_text)} characters from uploaded file: {filename}"
+            "Extracted %d characters from uploaded file: %s", len(resume_text), filename
         )
 
-        parsed_resume = self.parser.parse_resume(resume_text)
-        logger.info("Resume parsed successfully")
+        return self._parse_resume_text(resume_text)
 
-        return parsed_resume.model_dump(exclude_none=True)
+    @staticmethod
+    def _prepare_skills(parsed_resume: Dict, job_description: str) -> None:
+        """Normalize resume skills and expand them with related skills from the JD."""
+        # Normalize resume skills
+        skills = utils.normalize_skills(parsed_resume.get("skills", []))
+    
+        # Expand to include semantically similar ones found in JD
+        parsed_resume["skills"] = utils.fuzzy_expand_skills_list(skills, job_description)
+
+    def _screening_to_dict(self, screening_result) -> Dict:
+        """Convert a screener result to a normalized dictionary."""
+        # Accept either an object with model_dump or a plain dict from the screener
+        if hasattr(screening_result, "model_dump"):
+            result_dict = screening_result.model_dump(exclude_none=True)
+        elif isinstance(screening_result, dict):
+            result_dict = screening_result
+        else:
+            # fallback: try to convert to dict safely
+            try:
+                result_dict = dict(screening_result)
+            except Exception:
+                result_dict = {"error": "invalid screening result format"}
+
+        # Normalize fields that validation/tools expect to be objects
+        return self._normalize_screening_result(result_dict)
 
     def screen_resume(
         self,
@@ -315,37 +223,20 @@ class ResumeProcessor:
         Returns:
             Screening result as dictionary
         """
-        # Normalize resume skills
-        parsed_resume["skills"] = utils.normalize_skills(parsed_resume.get("skills", []))
-    
-        # Expand to include semantically similar ones found in JD
-        parsed_resume["skills"] = utils.fuzzy_expand_skills(parsed_resume["skills"], job_description)
+        self._prepare_skills(parsed_resume, job_description)
     
         screening_result = self.screener.screen_resume(
             parsed_resume, job_title, job_description, weights
         )
         logger.info(
-            f"Resume screened. Overall score: {screening_result.overall_score}/10"
+            "Resume screened. Overall score: %s/10", screening_result.overall_score
         )
-        # Accept either an object with model_dump or a plain dict from the screener
-        if hasattr(screening_result, "model_dump"):
-            result_dict = screening_result.model_dump(exclude_none=True)
-        elif isinstance(screening_result, dict):
-            result_dict = screening_result
-        else:
-            # fallback: try to convert to dict safely
-            try:
-                result_dict = dict(screening_result)
-            except Exception:
-                result_dict = {"error": "invalid screening result format"}
-
-        # Normalize fields that validation/tools expect to be objects
-        result_dict = self._normalize_screening_result(result_dict)
+        result_dict = self._screening_to_dict(screening_result)
 
         # Log overall score when present and numeric
         overall = result_dict.get("overall_score")
         try:
-            logger.info(f"Resume screened. Overall score: {overall}/10")
+            logger.info("Resume screened. Overall score: %s/10", overall)
         except Exception:
             logger.info("Resume screened.")
 
@@ -369,6 +260,53 @@ class ResumeProcessor:
         optimization = self.optimizer.generate_suggestions(parsed_resume, job_title, job_description, screening_result)
         return optimization.model_dump(exclude_none=True)
 
+    def screen_and_optimise_resume(
+        self,
+        parsed_resume: Dict,
+        job_title: str,
+        job_description: str,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> Tuple[Dict, Dict]:
+        """
+        Screen a parsed resume and generate optimisation suggestions in one LLM call.
+
+        Args:
+            parsed_resume: Parsed resume dictionary
+            job_title: Job position title
+            job_description: Job description and requirements
+            weights: Optional custom weights for scoring categories
+
+        Returns:
+            Tuple of (screening result, optimization suggestions) as dictionaries
+        """
+        self._prepare_skills(parsed_resume, job_description)
+
+        result = self.screener.screen_and_optimize(
+            parsed_resume, job_title, job_description, weights
+        )
+        screened = self._screening_to_dict(result.screening)
+        optimization = result.optimization.model_dump(exclude_none=True)
+        logger.info("Resume screened and optimised. Overall score: %s/10", screened.get('overall_score'))
+
+        return screened, optimization
+
+    def stream_optimise_resume(self, parsed_resume: Dict, job_title: str, job_description: str, screening_result: Dict) -> Iterator[Dict]:
+        """
+        Stream optimisation suggestions as they are generated.
+
+        Args:
+            parsed_resume: Parsed resume dictionary
+            job_title: Job position title
+            job_description: Job description and requirements
+            screening_result: Result from screening the resume
+
+        Yields:
+            Partially filled optimization suggestions as dictionaries;
+            the last one yielded is the complete, validated result
+        """
+        for partial in self.optimizer.stream_suggestions(parsed_resume, job_title, job_description, screening_result):
+            yield partial.model_dump(exclude_none=True)
+
     def process_resume_from_path(
         self,
         file_path: str,
@@ -388,16 +326,15 @@ class ResumeProcessor:
         Returns:
             Dictionary with 'parsed' and 'screened' keys
         """
-        logger.info(f"Processing resume from path: {file_path}")
+        logger.info("Processing resume from path: %s", file_path)
 
         # Parse resume
         parsed = self.parse_resume_from_path(file_path)
 
-        # Screen resume
-        screened = self.screen_resume(parsed, job_title, job_description, weights)
-
-        # Optimise the resume by providing suggestions
-        optimization = self.optimise_resume(parsed, job_title, job_description, screened)
+        # Screen the resume and generate optimisation suggestions in one LLM call
+        screened, optimization = self.screen_and_optimise_resume(
+            parsed, job_title, job_description, weights
+        )
 
         return {"parsed": parsed, "screened": screened, "optimization": optimization}
 
@@ -423,15 +360,14 @@ class ResumeProcessor:
         Returns:
             Dictionary with 'parsed' and 'screened' keys
         """
-        logger.info(f"Processing uploaded resume: {filename}")
+        logger.info("Processing uploaded resume: %s", filename)
 
         # Parse resume
         parsed = self.parse_resume_from_bytes(file_bytes, filename)
 
-        # Screen resume
-        screened = self.screen_resume(parsed, job_title, job_description, weights)
-
-       # Optimise the resume by providing suggestions
-        optimization = self.optimizer.generate_suggestions(parsed, job_title, job_description, screened)
+        # Screen the resume and generate optimisation suggestions in one LLM call
+        screened, optimization = self.screen_and_optimise_resume(
+            parsed, job_title, job_description, weights
+        )
 
-        return {"parsed": parsed, "screened": screened, "optimization": optimization}
\ No newline at end of file
+        return {"parsed": parsed, "screened": screened, "optimization": optimization}
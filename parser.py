@@ -1,8 +1,7 @@
-import instructor
 from pydantic import BaseModel, Field
 from typing import List, Optional
-import json
-from groq import Groq
+import orjson
+from groq_client import get_instructor_client, cached_response_model
 import logging
 import os
 from dotenv import load_dotenv
@@ -10,7 +9,7 @@ from dotenv import load_dotenv
 load_dotenv()  # Load environment variables from .env file
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 
@@ -164,6 +163,10 @@ class Resume(BaseModel):
         default_factory=list, description="List of publications"
     )
 
+# Response model with its JSON schema built once at import
+_RESUME_RESPONSE_MODEL = cached_response_model(Resume)
+
+
 class ResumeParser:
     """Resume parser class using Instructor for structured extraction from text."""
 
@@ -173,12 +176,11 @@ class ResumeParser:
         model: str = "openai/gpt-oss-120b", #using openai/gpt-oss-120b or llama-3.3-70b-versatile
         temperature: float = 0.3,
     ):
-        # Initialize Groq client and patch it with Instructor
-        groq_client = Groq(api_key=api_key or os.getenv("GROQ_API_KEY"))
-        self.client = instructor.from_groq(groq_client, mode=instructor.Mode.JSON)
+        # Reuse the shared Instructor-patched Groq client
+        self.client = get_instructor_client(api_key)
         self.model = model
         self.temperature = temperature
-        logger.info(f"Initialized ResumeParser with Groq model: {model}")
+        logger.info("Initialized ResumeParser with Groq model: %s", model)
 
     def parse_resume(self, resume_text: str) -> Resume:
         """Parse resume text into structured data."""
@@ -201,7 +203,7 @@ class ResumeParser:
             parsed_resume = self.client.chat.completions.create(
                 model=self.model,
                 temperature=self.temperature,
-                response_model=Resume,
+                response_model=_RESUME_RESPONSE_MODEL,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
@@ -213,13 +215,13 @@ class ResumeParser:
             return parsed_resume
 
         except Exception as e:
-            logger.error(f"Error during resume parsing: {e}")
+            logger.error("Error during resume parsing: %s", e)
             raise
 
     def export_to_json(self, resume: Resume, file_path: str = "") -> str:
         """Export parsed resume to JSON format."""
         json_data = resume.model_dump(exclude_none=True)
-        json_string = json.dumps(json_data, indent=2, default=str)
+        json_string = orjson.dumps(json_data, default=str, option=orjson.OPT_INDENT_2).decode()
 
         if file_path:
             with open(file_path, "w", encoding="utf-8") as f:
@@ -1,15 +1,14 @@
-import instructor
 import os
-import json
+import orjson
 import logging
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
-from groq import Groq
+from typing import List, Dict, Optional, Iterator
+from groq_client import get_instructor_client, cached_response_model, memoize_response
 from dotenv import load_dotenv
 
 load_dotenv()
 
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 # Data model for resume optimization request
@@ -21,15 +20,20 @@ class ResumeOptimizationRequest(BaseModel):
     customization_tips: list[str] = Field(default_factory=list, description="Suggestions to tailor the resume for this specific job.")
     priority_actions: list[str] = Field(default_factory=list, description="Top 3 most important actions to take immediately.")
 
+# Response model with its JSON schema built once at import
+_OPTIMIZATION_RESPONSE_MODEL = cached_response_model(ResumeOptimizationRequest)
+
+
 class ResumeOptimizer:
+    temperature = 0.5
+
     def __init__(self, api_key: str = "", model: str = "llama-3.3-70b-versatile"):
-        groq_client = Groq(api_key=api_key or os.getenv("GROQ_API_KEY"))
-        self.client = instructor.from_groq(groq_client, mode=instructor.Mode.JSON)
+        self.client = get_instructor_client(api_key)
         self.model = model
-        logger.info(f"ResumeOptimizer initialized with model {model}")
+        logger.info("ResumeOptimizer initialized with model %s", model)
 
-    def generate_suggestions(self, parsed_resume: dict, job_title: str, job_description: str, screening_result: dict) -> ResumeOptimizationRequest:
-        """Generate LLM-based optimization suggestions for the resume."""
+    def _build_messages(self, parsed_resume: dict, job_title: str, job_description: str, screening_result: dict) -> List[Dict[str, str]]:
+        """Build the chat messages for the optimization prompt."""
         system_prompt = """
         You are an expert career coach and technical recruiter.
         Analyze the candidate's resume in relation to the job description and the screening evaluation results.
@@ -57,15 +61,20 @@ class ResumeOptimizer:
         5. Top 3 priority actions to improve the resume immediately.
         """
 
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    @memoize_response(_OPTIMIZATION_RESPONSE_MODEL)
+    def generate_suggestions(self, parsed_resume: dict, job_title: str, job_description: str, screening_result: dict) -> ResumeOptimizationRequest:
+        """Generate LLM-based optimization suggestions for the resume."""
         try:
             result = self.client.chat.completions.create(
                 model=self.model,
-                temperature=0.5,
-                response_model=ResumeOptimizationRequest,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
+                temperature=self.temperature,
+                response_model=_OPTIMIZATION_RESPONSE_MODEL,
+                messages=self._build_messages(parsed_resume, job_title, job_description, screening_result),
                 max_retries=2,
             )
 
@@ -73,7 +82,35 @@ class ResumeOptimizer:
             return result
 
         except Exception as e:
-            logger.error(f"Error generating resume optimization suggestions: {e}")
+            logger.error("Error generating resume optimization suggestions: %s", e)
+            raise
+
+    def stream_suggestions(self, parsed_resume: dict, job_title: str, job_description: str, screening_result: dict) -> Iterator[ResumeOptimizationRequest]:
+        """
+        Stream optimization suggestions as the LLM generates them.
+        Yields partially filled results, then the final result validated as a
+        ResumeOptimizationRequest (so fields the model left out get their
+        defaults, as with generate_suggestions).
+        """
+        try:
+            partial = None
+            for partial in self.client.chat.completions.create_partial(
+                model=self.model,
+                temperature=self.temperature,
+                response_model=_OPTIMIZATION_RESPONSE_MODEL,
+                messages=self._build_messages(parsed_resume, job_title, job_description, screening_result),
+                max_retries=2,
+            ):
+                yield partial
+
+            if partial is None:
+                raise ValueError("No optimization suggestions were streamed")
+            yield ResumeOptimizationRequest.model_validate(partial.model_dump(exclude_none=True))
+
+            logger.info("✅ Resume optimization suggestions streamed successfully")
+
+        except Exception as e:
+            logger.error("Error streaming resume optimization suggestions: %s", e)
             raise
 
     def export_optimization_to_json(
@@ -83,11 +120,11 @@ class ResumeOptimizer:
     ) -> str:
         """Export optimization result to JSON format."""
         json_data = optimization_result.model_dump(exclude_none=True)
-        json_string = json.dumps(json_data, indent=2, default=str)
+        json_string = orjson.dumps(json_data, default=str, option=orjson.OPT_INDENT_2).decode()
         
         if file_path:
             with open(file_path, "w", encoding="utf-8") as f:
                 f.write(json_string)
-            logger.info(f"Optimisation result exported to: {file_path}")
+            logger.info("Optimisation result exported to: %s", file_path)
         
         return json_string
\ No newline at end of file
@@ -3,11 +3,11 @@ Resume Screener using Instructor Library
 This module provides structured scoring and evaluation of resumes against job requirements.
 """
 
-import instructor
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
-import json
-from groq import Groq
+import orjson
+from groq_client import get_instructor_client, cached_response_model, memoize_response
+from resume_optimizer import ResumeOptimizationRequest
 import logging
 import os
 from dotenv import load_dotenv
@@ -15,7 +15,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 
@@ -187,6 +187,18 @@ class ResumeScreeningResult(BaseModel):
         description="Top 3-5 concerns or gaps for this role"
     )
     
+
+class ScreenAndOptimizeResult(BaseModel):
+    """Screening evaluation and resume optimization suggestions from one LLM call."""
+    
+    screening: ResumeScreeningResult
+    optimization: ResumeOptimizationRequest
+
+
+# Response models with their JSON schemas built once at import
+_SCREENING_RESPONSE_MODEL = cached_response_model(ResumeScreeningResult)
+_SCREEN_AND_OPTIMIZE_RESPONSE_MODEL = cached_response_model(ScreenAndOptimizeResult)
+
 class ResumeScreener:
     """
     Resume screener that evaluates candidates against job requirements.
@@ -213,12 +225,12 @@ class ResumeScreener:
             raise RuntimeError(
                 "Groq API key not provided. Set GROQ_API_KEY environment variable or pass api_key to ResumeScreener()."
             )
-        groq_client = Groq(api_key=api_key_value)
-        self.client = instructor.from_groq(groq_client, mode=instructor.Mode.JSON)
+        self.client = get_instructor_client(api_key_value)
         self.model = model
         self.temperature = temperature
-        logger.info(f"Initialized ResumeScreener with Groq model: {model}")
+        logger.info("Initialized ResumeScreener with Groq model: %s", model)
     
+    @memoize_response(_SCREENING_RESPONSE_MODEL)
     def screen_resume(
         self,
         parsed_resume: Dict,
@@ -245,6 +257,73 @@ class ResumeScreener:
         Returns:
             ResumeScreeningResult with detailed scoring and analysis
         """
+        try:
+            screening_result = self.client.chat.completions.create(
+                model=self.model,
+                temperature=self.temperature,
+                response_model=_SCREENING_RESPONSE_MODEL,
+                messages=self._build_messages(parsed_resume, job_title, job_description, weights),
+                max_retries=3,
+            )
+            
+            logger.info("Resume screening completed. Overall score: %s/10", screening_result.overall_score)
+            return screening_result
+            
+        except Exception as e:
+            logger.error("Error during resume screening: %s", e)
+            raise
+
+    @memoize_response(_SCREEN_AND_OPTIMIZE_RESPONSE_MODEL)
+    def screen_and_optimize(
+        self,
+        parsed_resume: Dict,
+        job_title: str,
+        job_description: str,
+        weights: Optional[Dict[str, float]] = None
+    ) -> ScreenAndOptimizeResult:
+        """
+        Screen a resume and suggest improvements in a single LLM call.
+        Same inputs as screen_resume; the model first scores the candidate,
+        then suggests how to optimize the resume for this job.
+        
+        Returns:
+            ScreenAndOptimizeResult with the screening and the optimization suggestions
+        """
+        messages = self._build_messages(parsed_resume, job_title, job_description, weights)
+        messages[1]["content"] += """
+        After scoring, act as an expert career coach: using your evaluation above,
+        suggest how the candidate should optimize this resume for the job:
+        1. Missing or weak skills.
+        2. Content gaps (projects, achievements, experience).
+        3. Formatting and structure improvements.
+        4. Customization tips for this specific job.
+        5. Top 3 priority actions to improve the resume immediately.
+        """
+        
+        try:
+            result = self.client.chat.completions.create(
+                model=self.model,
+                temperature=self.temperature,
+                response_model=_SCREEN_AND_OPTIMIZE_RESPONSE_MODEL,
+                messages=messages,
+                max_retries=3,
+            )
+            
+            logger.info("Resume screening and optimization completed. Overall score: %s/10", result.screening.overall_score)
+            return result
+            
+        except Exception as e:
+            logger.error("Error during resume screening and optimization: %s", e)
+            raise
+
+    def _build_messages(
+        self,
+        parsed_resume: Dict,
+        job_title: str,
+        job_description: str,
+        weights: Optional[Dict[str, float]] = None
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for the screening prompt."""
         # Default weights if not provided
         if weights is None:
             weights = {
@@ -313,24 +392,10 @@ Reward resumes demonstrating transferable skills even if not explicitly listed.
         Identify which categories (skills, experience, education, etc.) are most emphasized in this JD and return weight suggestions
         """
         
-        try:
-            screening_result = self.client.chat.completions.create(
-                model=self.model,
-                temperature=self.temperature,
-                response_model=ResumeScreeningResult,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                max_retries=3,
-            )
-            
-            logger.info(f"Resume screening completed. Overall score: {screening_result.overall_score}/10")
-            return screening_result
-            
-        except Exception as e:
-            logger.error(f"Error during resume screening: {e}")
-            raise
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
     
     def _format_resume_for_screening(self, parsed_resume: Dict) -> str:
         """Format parsed resume data into a readable string for screening."""
@@ -414,11 +479,11 @@ Reward resumes demonstrating transferable skills even if not explicitly listed.
     ) -> str:
         """Export screening result to JSON format."""
         json_data = screening_result.model_dump(exclude_none=True)
-        json_string = json.dumps(json_data, indent=2, default=str)
+        json_string = orjson.dumps(json_data, default=str, option=orjson.OPT_INDENT_2).decode()
         
         if file_path:
             with open(file_path, "w", encoding="utf-8") as f:
                 f.write(json_string)
-            logger.info(f"Screening result exported to: {file_path}")
+            logger.info("Screening result exported to: %s", file_path)
         
         return json_string
\ No newline at end of file
@@ -1,5 +1,34 @@
+import functools
+import itertools
+import logging
+import operator
+import os
+import re
+import sys
+import threading
+import numpy as np
+from cachetools import LRUCache
 from rapidfuzz import fuzz, process
 
+try:
+    import ahocorasick
+except ImportError:  # optional C extension; fall back to a single regex
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+# Threads rapidfuzz may use for one cdist call (-1 = all cores). Set lower in
+# containers whose CPU limit is below the host's core count.
+RAPIDFUZZ_WORKERS = int(os.getenv("RAPIDFUZZ_WORKERS", "-1"))
+
+# Below this many skill x term pairs a cdist call finishes faster than its
+# worker threads start, so it runs single-threaded
+_PARALLEL_MIN_PAIRS = 20_000
+
+def _cdist_workers(n_skills, n_terms):
+    """Thread count for a cdist call of the given size."""
+    return RAPIDFUZZ_WORKERS if n_skills * n_terms >= _PARALLEL_MIN_PAIRS else 1
+
 # Canonical mapping for common skills
 SKILL_SYNONYMS = {
     "sql": ["mysql", "postgresql", "sqlite", "mariadb"],
@@ -11,25 +40,124 @@ SKILL_SYNONYMS = {
     # add more as needed
 }
 
+# Variant (or canonical name) -> canonical skill, built once at import.
+# setdefault keeps the first group that lists a name, as the old linear scan did.
+_SYNONYM_INDEX = {}
+for _canonical, _variants in SKILL_SYNONYMS.items():
+    _SYNONYM_INDEX.setdefault(_canonical, _canonical)
+    for _variant in _variants:
+        _SYNONYM_INDEX.setdefault(_variant, _canonical)
+del _canonical, _variants, _variant
+
+# Every canonical skill and variant, built once at import
+_ALL_KNOWN = frozenset(itertools.chain.from_iterable(SKILL_SYNONYMS.values())) | frozenset(SKILL_SYNONYMS)
+
+# Sorted so JD term order (and therefore fuzzy-match tie-breaking) is deterministic
+SKILL_VOCAB = tuple(sorted(_ALL_KNOWN))
+
+def _is_multi_word(text):
+    """True if text has more than one token the way token_set_ratio splits it."""
+    return len(text.split()) > 1
+
+def _bigrams(text):
+    """Set of character bigrams in text."""
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+_TERM_BIGRAMS = {t: frozenset(_bigrams(t)) for t in SKILL_VOCAB}
+
+# At a threshold of 85+, a single-word skill of 4+ chars must share a bigram
+# with a term to reach it: the score bounds the length gap and edit count, and
+# each edit destroys at most two of the skill's bigrams
+_BIGRAM_PREFILTER_MIN_THRESHOLD = 85
+_BIGRAM_PREFILTER_MIN_LEN = 4
+
+if ahocorasick is not None:
+    # Automaton over the whole vocabulary: one linear pass reports every
+    # (possibly overlapping) occurrence
+    _TERM_AUTOMATON = ahocorasick.Automaton()
+    for _term in SKILL_VOCAB:
+        _TERM_AUTOMATON.add_word(_term, _term)
+    _TERM_AUTOMATON.make_automaton()
+    del _term
+else:
+    # Longest-first alternation inside a lookahead finds the longest term
+    # starting at each position; shorter terms hidden inside it (e.g. "sql" in
+    # "postgresql") are added back from _CONTAINED_TERMS.
+    _TERM_RE = re.compile(
+        "(?=(" + "|".join(map(re.escape, sorted(SKILL_VOCAB, key=len, reverse=True))) + "))"
+    )
+    _CONTAINED_TERMS = {t: tuple(u for u in SKILL_VOCAB if u in t) for t in SKILL_VOCAB}
+
+@functools.lru_cache(maxsize=256)
+def _find_jd_terms(jd_text_lower):
+    """
+    Known skill terms mentioned in a (lowercased) job description.
+    Cached because the same JD is usually screened against many resumes.
+    """
+    if ahocorasick is not None:
+        found = {term for _, term in _TERM_AUTOMATON.iter(jd_text_lower)}
+    else:
+        found = set()
+        for longest in set(_TERM_RE.findall(jd_text_lower)):
+            found.update(_CONTAINED_TERMS[longest])
+    return tuple(sorted(found))
+
+# (jd_terms, threshold) -> LRU of {skill: best JD term, or None below threshold}.
+# Lets overlapping skill sets scored against the same JD reuse earlier rows.
+# Both levels are bounded, so a popular JD cannot grow its memo without limit.
+_SKILL_MATCHES = LRUCache(maxsize=256)
+_SKILL_MATCHES_PER_JD = 4096
+_SKILL_MATCHES_LOCK = threading.Lock()
+
+def _cached_skill_matches(skills, jd_terms, threshold):
+    """Earlier matches of these skills against the JD terms, as a private dict."""
+    with _SKILL_MATCHES_LOCK:
+        memo = _SKILL_MATCHES.get((jd_terms, threshold))
+        if memo is None:
+            return {}
+        return {s: memo[s] for s in skills if s in memo}
+
+def _remember_skill_matches(skill_matches, jd_terms, threshold):
+    """Add skill matches against the JD terms to the shared memo."""
+    key = (jd_terms, threshold)
+    with _SKILL_MATCHES_LOCK:
+        memo = _SKILL_MATCHES.get(key)
+        if memo is None:
+            memo = _SKILL_MATCHES[key] = LRUCache(maxsize=_SKILL_MATCHES_PER_JD)
+        memo.update(skill_matches)
+
+def _valid_skills(skills):
+    """
+    Keep only non-blank string skills. Validating once here means the code
+    below never has to guard string methods or rapidfuzz calls against bad input.
+    """
+    return frozenset(s for s in skills if isinstance(s, str) and s.strip())
+
 def normalize_skills(skills):
-    """Normalize and unify related skill names."""
+    """
+    Normalize and unify related skill names.
+    Returns a frozenset, which fuzzy_expand_skills takes without copying;
+    use normalize_skills_list where a list is needed.
+    """
+    lookup = _SYNONYM_INDEX.get
     normalized = set()
-    skills = [s.lower().strip() for s in skills]
-    for skill in skills:
-        matched = False
-        for canonical, variants in SKILL_SYNONYMS.items():
-            if skill == canonical or skill in variants:
-                normalized.add(canonical)
-                matched = True
-                break
-        if not matched:
-            normalized.add(skill)
-    return list(normalized)
+    for skill in _valid_skills(skills or ()):
+        # Interned so the many resumes listing the same skill share one string
+        # in the long-lived match caches
+        skill = sys.intern(skill.lower().strip())
+        normalized.add(lookup(skill, skill))
+    return frozenset(normalized)
+
+def normalize_skills_list(skills):
+    """normalize_skills returning a list (e.g. for JSON output)."""
+    return list(normalize_skills(skills))
 
 def fuzzy_expand_skills(skills, jd_text, threshold=85):
     """
     Detect approximate or implied skills from job description.
     E.g. SQL <-> MySQL, NoSQL <-> MongoDB.
+    Returns a frozenset of the skills plus their matched JD terms;
+    use fuzzy_expand_skills_list where a list is needed.
     """
     # all_known = set(sum(SKILL_SYNONYMS.values(), [])) | set(SKILL_SYNONYMS.keys())
     # jd_text_lower = jd_text.lower()
@@ -44,30 +172,140 @@ def fuzzy_expand_skills(skills, jd_text, threshold=85):
 
 
     # Guard against empty inputs
-    if not skills or not jd_text:
+    if not skills:
+        return frozenset()
+    skills = _valid_skills(skills)
+    if not skills or not isinstance(jd_text, str) or not jd_text:
         return skills
 
-    all_known = set(sum(SKILL_SYNONYMS.values(), [])) | set(SKILL_SYNONYMS.keys())
-    jd_text_lower = jd_text.lower()
-    jd_terms = [t for t in all_known if t in jd_text_lower]
+    jd_terms = _find_jd_terms(jd_text.lower())
 
     # If no terms found in job description, return original skills
     if not jd_terms:
         return skills
 
-    matched = []
-    for skill in skills:
-        try:
-            # Handle case when no matches found
-            result = process.extractOne(skill, jd_terms, scorer=fuzz.token_set_ratio)
-            if result:  # Check if match was found
-                match, score, _ = result
-                if score >= threshold:
-                    matched.append(match)
-        except Exception as e:
-            # Log error but continue processing other skills
-            print(f"Error matching skill '{skill}': {str(e)}")
-            continue
+    # Unique set of original + matched skills
+    return _fuzzy_expand_cached(skills, jd_terms, threshold)
+
+def fuzzy_expand_skills_list(skills, jd_text, threshold=85):
+    """fuzzy_expand_skills returning a list (e.g. for JSON output)."""
+    return list(fuzzy_expand_skills(skills, jd_text, threshold))
+
+@functools.lru_cache(maxsize=4096)
+def _fuzzy_expand_cached(skills, jd_terms, threshold):
+    """
+    Cached core of fuzzy_expand_skills. The expansion depends only on the
+    JD's known terms, not its full text, so it is keyed on (skills, jd_terms,
+    threshold) and no entry keeps a copy of the job description alive.
+    """
+    skill_matches = _cached_skill_matches(skills, jd_terms, threshold)
+    _score_new_skills(skills, jd_terms, skill_matches, threshold)
+    _remember_skill_matches(skill_matches, jd_terms, threshold)
+
+    matched = {skill_matches[s] for s in skills}
+    matched.discard(None)
+    return skills | matched
+
+def _score_new_skills(skills, jd_terms, skill_matches, threshold):
+    """Record the best JD term for each skill not yet in skill_matches."""
+    # Only skills not yet scored against this JD go through cdist
+    new_skills = [s for s in set(skills) if s not in skill_matches]
+    if not new_skills:
+        return
+
+    # JD terms come from the lowercase vocabulary; canonicalize the skills the
+    # same way once here so the scorers can run with processor=None
+    queries = [s.lower().strip() for s in new_skills]
 
-    # Return unique set of original + matched skills
-    return list(set(skills + matched))
\ No newline at end of file
+    # A skill that already is a JD term can only match itself, and a longer
+    # single-word skill sharing no bigram with any JD term cannot match at all;
+    # neither needs cdist
+    jd_term_set = set(jd_terms)
+    prefilter = threshold >= _BIGRAM_PREFILTER_MIN_THRESHOLD
+    jd_bigrams = frozenset().union(*(_TERM_BIGRAMS[t] for t in jd_terms)) if prefilter else None
+    fuzzy_rows = []
+    for skill, query in zip(new_skills, queries):
+        if query in jd_term_set:
+            skill_matches[skill] = query
+        elif (
+            prefilter
+            and len(query) >= _BIGRAM_PREFILTER_MIN_LEN
+            and not _is_multi_word(query)
+            # Lazy probe: stops at the first shared bigram, no per-skill set
+            and jd_bigrams.isdisjoint(map(operator.add, query, query[1:]))
+        ):
+            skill_matches[skill] = None
+        else:
+            fuzzy_rows.append((skill, query))
+    if not fuzzy_rows:
+        return
+    new_skills, queries = map(list, zip(*fuzzy_rows))
+
+    # Score every new skill against every JD term in one native call
+    # (skills x jd_terms uint8 matrix, multi-threaded when large). Plain ratio is
+    # a single edit-distance pass per pair and settles most skills.
+    scores = process.cdist(
+        queries, jd_terms, scorer=fuzz.ratio, processor=None, score_cutoff=threshold,
+        dtype=np.uint8, workers=_cdist_workers(len(queries), len(jd_terms))
+    )
+    best_idx = scores.argmax(axis=1)
+    best_score = scores.max(axis=1)
+
+    # token_set_ratio only differs from ratio when a multi-word string is
+    # involved, so rows without a ratio hit are rescored with it: multi-word
+    # skills against every term, single-word skills against multi-word terms
+    misses = np.flatnonzero(best_score < threshold)
+    if misses.size:
+        phrase_terms = np.array([j for j, t in enumerate(jd_terms) if _is_multi_word(t)], dtype=np.intp)
+        is_phrase = np.array([_is_multi_word(queries[i]) for i in misses], dtype=bool)
+        for rows, cols in (
+            (misses[is_phrase], np.arange(len(jd_terms))),
+            (misses[~is_phrase], phrase_terms),
+        ):
+            if not rows.size or not cols.size:
+                continue
+            retry = process.cdist(
+                [queries[i] for i in rows], [jd_terms[j] for j in cols],
+                scorer=fuzz.token_set_ratio, processor=None, score_cutoff=threshold,
+                dtype=np.uint8, workers=_cdist_workers(rows.size, cols.size)
+            )
+            retry_best = retry.max(axis=1)
+            better = retry_best > best_score[rows]
+            best_idx[rows[better]] = cols[retry.argmax(axis=1)[better]]
+            best_score[rows[better]] = retry_best[better]
+
+    for skill, idx, score in zip(new_skills, best_idx, best_score):
+        skill_matches[skill] = jd_terms[idx] if score >= threshold else None
+    logger.debug(
+        "Fuzzy-scored %d new skills against %d JD terms (%d token-set rescored)",
+        len(new_skills), len(jd_terms), misses.size,
+    )
+
+def fuzzy_expand_skills_batch(skill_lists, jd_text, threshold=85):
+    """
+    fuzzy_expand_skills for many resumes against one job description.
+    The skills of all resumes are scored in a single cdist call.
+    Returns one frozenset per resume.
+    """
+    skill_lists = [_valid_skills(skills) if skills else frozenset() for skills in skill_lists]
+    if not isinstance(jd_text, str) or not jd_text:
+        return skill_lists
+
+    jd_terms = _find_jd_terms(jd_text.lower())
+    if not jd_terms:
+        return skill_lists
+
+    all_skills = frozenset(itertools.chain.from_iterable(skill_lists))
+    skill_matches = _cached_skill_matches(all_skills, jd_terms, threshold)
+    _score_new_skills(all_skills, jd_terms, skill_matches, threshold)
+    _remember_skill_matches(skill_matches, jd_terms, threshold)
+
+    expanded = []
+    for skills in skill_lists:
+        if not skills:
+            expanded.append(skills)
+            continue
+        matched = {skill_matches[s] for s in skills}
+        matched.discard(None)
+        expanded.append(skills | matched)
+    return expanded
\ No newline at end of file